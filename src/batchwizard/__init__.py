@@ -1,6 +1,6 @@
 # __init__.py
 from .cli import app
 from .models import BatchJob, BatchJobResult
-from .processor import BatchProcessor
+from .processor import BatchProcessor, get_processor
 
-__all__ = ["BatchProcessor", "BatchJob", "BatchJobResult", "app"]
+__all__ = ["BatchProcessor", "BatchJob", "BatchJobResult", "app", "get_processor"]
@@ -1,5 +1,6 @@
 # cli.py
 import asyncio
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -9,7 +10,7 @@ from rich.console import Console
 from rich.table import Table
 
 from .config import BatchWizardSettings, config
-from .processor import BatchProcessor
+from .processor import get_processor
 from .ui import BatchWizardUI
 from .utils import get_api_key, set_api_key, setup_logger
 
@@ -18,6 +19,18 @@ console = Console()
 logger = setup_logger(console)
 
 
+def _run(coro):
+    """Run a command's coroutine, on uvloop (winloop on Windows) if installed."""
+    try:
+        if sys.platform == "win32":
+            import winloop as uvloop
+        else:
+            import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
 @app.command()
 def process(
     input_paths: list[Path] = typer.Argument(
@@ -27,10 +40,26 @@ def process(
         None, help="Directory to store output files"
     ),
     max_concurrent_jobs: int = typer.Option(
-        5, help="Maximum number of concurrent jobs"
+        5,
+        help="Maximum number of concurrent API calls of each kind (uploads, job creations, downloads)",
+    ),
+    max_concurrent_uploads: Optional[int] = typer.Option(
+        None,
+        help="Maximum number of concurrent file uploads (defaults to --max-concurrent-jobs)",
+        show_default=False,
+    ),
+    max_concurrent_creates: Optional[int] = typer.Option(
+        None,
+        help="Maximum number of concurrent batch job creations (defaults to --max-concurrent-jobs)",
+        show_default=False,
+    ),
+    max_concurrent_downloads: Optional[int] = typer.Option(
+        None,
+        help="Maximum number of concurrent result downloads (defaults to --max-concurrent-jobs)",
+        show_default=False,
     ),
-    check_interval: int = typer.Option(
-        5, help="Initial interval (in seconds) between job status checks"
+    check_interval: float = typer.Option(
+        0.5, help="Initial interval (in seconds) between job status checks"
     ),
 ):
     """Process batch jobs from input files or directories."""
@@ -46,20 +75,19 @@ def process(
         raise typer.Exit(code=1)
 
     config.settings.max_concurrent_jobs = max_concurrent_jobs
+    config.settings.max_concurrent_uploads = max_concurrent_uploads
+    config.settings.max_concurrent_creates = max_concurrent_creates
+    config.settings.max_concurrent_downloads = max_concurrent_downloads
     config.settings.check_interval = check_interval
     config.save()
 
-    processor = BatchProcessor()
-    ui = BatchWizardUI(Console())
+    ui = BatchWizardUI(console)
 
     async def run_and_close():
-        try:
+        async with get_processor() as processor:
             await ui.run_processing(processor, input_paths, output_directory)
-        finally:
-            await processor.close()
-
-    asyncio.run(run_and_close())
 
+    _run(run_and_close())
 
 
 @app.command()
@@ -80,8 +108,24 @@ def configure(
         api_key = get_api_key()
         masked_key = f"{api_key[:4]}...{api_key[-4:]}" if api_key else "Not set"
         console.print(f"API Key: {masked_key}")
-        console.print(f"Max Concurrent Jobs: {config.settings.max_concurrent_jobs}")
+        max_jobs = config.settings.max_concurrent_jobs
+        console.print(f"Max Concurrent Jobs: {max_jobs}")
+        console.print(
+            f"Max Concurrent Uploads: {config.settings.max_concurrent_uploads or max_jobs}"
+        )
+        console.print(
+            f"Max Concurrent Creates: {config.settings.max_concurrent_creates or max_jobs}"
+        )
+        console.print(
+            f"Max Concurrent Downloads: {config.settings.max_concurrent_downloads or max_jobs}"
+        )
         console.print(f"Check Interval: {config.settings.check_interval} seconds")
+        console.print(
+            f"Max Check Interval: {config.settings.check_interval_max} seconds"
+        )
+        console.print(
+            f"Check Interval Growth: {config.settings.check_interval_growth}x"
+        )
     elif reset:
         config.settings = BatchWizardSettings()
         config.save()
@@ -100,9 +144,7 @@ def list_jobs(
     """List recent batch jobs."""
 
     async def fetch_jobs():
-        processor = BatchProcessor()
-        console = Console()  # Create a Console object directly
-        try:
+        async with get_processor() as processor:
             jobs = await processor.client.batches.list(limit=None if all else limit)
             table = Table(title="Batch Jobs")
             table.add_column("Job ID", style="cyan")
@@ -123,10 +165,8 @@ def list_jobs(
                     str(job.request_counts.failed),
                 )
             console.print(table)  # Use the console object to print the table
-        finally:
-            await processor.close()
 
-    asyncio.run(fetch_jobs())
+    _run(fetch_jobs())
 
 
 @app.command()
@@ -136,16 +176,14 @@ def cancel(
     """Cancel a specific batch job."""
 
     async def cancel_job():
-        processor = BatchProcessor()
-        try:
-            await processor.client.batches.cancel(job_id)
-            console.print(f"[green]Job {job_id} cancelled successfully.[/green]")
-        except Exception as e:
-            console.print(f"[red]Error cancelling job {job_id}: {str(e)}[/red]")
-        finally:
-            await processor.close()
+        async with get_processor() as processor:
+            try:
+                await processor.client.batches.cancel(job_id)
+                console.print(f"[green]Job {job_id} cancelled successfully.[/green]")
+            except Exception as e:
+                console.print(f"[red]Error cancelling job {job_id}: {str(e)}[/red]")
 
-    asyncio.run(cancel_job())
+    _run(cancel_job())
 
 
 @app.command()
@@ -162,30 +200,30 @@ def download(
         output_file = Path(f"{job_id}_results.jsonl")
 
     async def download_results():
-        processor = BatchProcessor()
-        try:
-            batch_job = await processor.client.batches.retrieve(job_id)
-            if batch_job.status != "completed":
+        async with get_processor() as processor:
+            try:
+                batch_job = await processor.client.batches.retrieve(job_id)
+                if batch_job.status != "completed":
+                    console.print(
+                        f"[yellow]Job {job_id} is not completed (status: {batch_job.status}). Cannot download results.[/yellow]"
+                    )
+                    return
+
+                success = await processor.download_batch_results(batch_job, output_file)
+                if success:
+                    console.print(
+                        f"[green]Results for job {job_id} downloaded successfully to {output_file}[/green]"
+                    )
+                else:
+                    console.print(
+                        f"[red]Failed to download results for job {job_id}[/red]"
+                    )
+            except Exception as e:
                 console.print(
-                    f"[yellow]Job {job_id} is not completed (status: {batch_job.status}). Cannot download results.[/yellow]"
+                    f"[red]Error downloading results for job {job_id}: {str(e)}[/red]"
                 )
-                return
 
-            success = await processor.download_batch_results(batch_job, output_file)
-            if success:
-                console.print(
-                    f"[green]Results for job {job_id} downloaded successfully to {output_file}[/green]"
-                )
-            else:
-                console.print(f"[red]Failed to download results for job {job_id}[/red]")
-        except Exception as e:
-            console.print(
-                f"[red]Error downloading results for job {job_id}: {str(e)}[/red]"
-            )
-        finally:
-            await processor.close()
-
-    asyncio.run(download_results())
+    _run(download_results())
 
 
 if __name__ == "__main__":
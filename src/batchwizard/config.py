@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
+import orjson
 import typer
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,7 +12,15 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class BatchWizardSettings(BaseSettings):
     api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
     max_concurrent_jobs: int = 5
-    check_interval: int = 5
+    # Per-call concurrency limits; unset means max_concurrent_jobs
+    max_concurrent_uploads: Optional[int] = None
+    max_concurrent_creates: Optional[int] = None
+    max_concurrent_downloads: Optional[int] = None
+    check_interval: float = 0.5
+    check_interval_max: float = 30
+    check_interval_growth: float = 1.25
+    # Consecutive rate-limit/connection/5xx poll errors before jobs are failed
+    max_transient_failures: int = 10
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
@@ -28,13 +37,13 @@ class Config(BaseModel):
 
     def load(self) -> None:
         if self.config_file.exists():
-            self.settings = BatchWizardSettings.model_validate_json(
-                self.config_file.read_text()
+            self.settings = BatchWizardSettings.model_validate(
+                orjson.loads(self.config_file.read_bytes())
             )
 
     def save(self) -> None:
         self.config_dir.mkdir(parents=True, exist_ok=True)
-        self.config_file.write_text(self.settings.model_dump_json())
+        self.config_file.write_bytes(orjson.dumps(self.settings.model_dump()))
 
     def get_api_key(self) -> Optional[str]:
         return self.settings.api_key or os.getenv("OPENAI_API_KEY")
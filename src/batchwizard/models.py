@@ -1,18 +1,50 @@
 # models.py
+import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from pydantic import BaseModel
+from openai.types import Batch
 
+# slots=True is only available on Python 3.10+
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-class BatchJob(BaseModel):
+
+def normalize_status(status: str) -> str:
+    """Normalize the status string to lowercase with underscores."""
+    return status.lower().replace(" ", "_")
+
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
+class BatchJob:
     id: str
     status: str
     input_file_id: str
     output_file_id: Optional[str] = None
 
+    @classmethod
+    def from_openai(cls, batch: Batch) -> "BatchJob":
+        """Build a BatchJob from an OpenAI SDK Batch object."""
+        return cls(
+            id=batch.id,
+            status=normalize_status(batch.status),
+            input_file_id=batch.input_file_id,
+            output_file_id=batch.output_file_id,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchJob":
+        """Build a BatchJob from a raw batch object decoded from the API's JSON."""
+        return cls(
+            id=data["id"],
+            status=normalize_status(data["status"]),
+            input_file_id=data["input_file_id"],
+            output_file_id=data.get("output_file_id"),
+        )
+
 
-class BatchJobResult(BaseModel):
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
+class BatchJobResult:
     job_id: str
     success: bool
     output_file_path: Optional[Path] = None
@@ -1,29 +1,117 @@
 # processor.py
 import asyncio
+import os
+import random
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import aiofiles
+import httpx
+import orjson
 from loguru import logger
-from openai import AsyncOpenAI
+from openai import (APIConnectionError, APIStatusError, AsyncOpenAI,
+                    DefaultAsyncHttpxClient, InternalServerError,
+                    RateLimitError)
+
+try:
+    import httpx_aiohttp  # noqa: F401
+    from openai import DefaultAioHttpClient
+except ImportError:  # aiohttp extra not installed
+    DefaultAioHttpClient = None
 
 from .config import config
-from .models import BatchJob, BatchJobResult
+from .models import BatchJob, BatchJobResult, normalize_status
+
+# Errors worth retrying on the next poll instead of failing the job
+TRANSIENT_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+LIST_PAGE_SIZE = 100
+MAX_LIST_PAGES = 10  # Pending jobs not found within this many pages are retrieved
+
+
+def _walk_inputs(input_paths: List[Path]) -> Tuple[List[Path], List[Path]]:
+    """Split input paths into JSONL files to process and skipped paths."""
+    input_files, skipped = [], []
+    for path in input_paths:
+        if path.is_dir():
+            with os.scandir(path) as entries:
+                input_files.extend(
+                    Path(entry.path)
+                    for entry in entries
+                    if entry.is_file() and entry.name.lower().endswith(".jsonl")
+                )
+        elif path.suffix.lower() == ".jsonl":
+            input_files.append(path)
+        else:
+            skipped.append(path)
+    return input_files, skipped
 
 
 class BatchProcessor:
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=config.get_api_key())
         self.settings = config.settings
+        self.client = AsyncOpenAI(
+            api_key=config.get_api_key(), http_client=self.create_http_client()
+        )
+        # Batch IDs awaiting a terminal status, resolved by a single shared poller
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._poller_task: Optional[asyncio.Task] = None
+        # Plain attributes so the poll loop doesn't go through pydantic on each tick
+        self._check_interval = self.settings.check_interval
+        self._max_interval = self.settings.check_interval_max
+        self._growth = self.settings.check_interval_growth
+        self._max_transient_failures = self.settings.max_transient_failures
+        self._poll_interval = self._check_interval
+        max_jobs = self.settings.max_concurrent_jobs
+        self._concurrency_limits = {
+            "upload": self.settings.max_concurrent_uploads or max_jobs,
+            "create": self.settings.max_concurrent_creates or max_jobs,
+            "download": self.settings.max_concurrent_downloads or max_jobs,
+        }
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self, kind: str) -> asyncio.Semaphore:
+        """Return the semaphore limiting one kind of API call.
+
+        Semaphores are created inside the running loop, since on Python 3.9 they
+        bind to the event loop that is current when they are constructed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphores = {}
+            self._semaphore_loop = loop
+        semaphore = self._semaphores.get(kind)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._concurrency_limits[kind])
+            self._semaphores[kind] = semaphore
+        return semaphore
+
+    def create_http_client(self) -> httpx.AsyncClient:
+        """Create the HTTP client, sizing the connection pool to the job fan-out."""
+        if DefaultAioHttpClient:
+            return DefaultAioHttpClient()
+
+        max_jobs = self.settings.max_concurrent_jobs
+        limits = httpx.Limits(
+            max_connections=max(1000, max_jobs * 8),
+            max_keepalive_connections=max(100, max_jobs * 2),
+        )
+        return DefaultAsyncHttpxClient(
+            limits=limits, timeout=httpx.Timeout(60.0, connect=10.0)
+        )
 
     async def upload_file(self, file_path: Path) -> Optional[str]:
         try:
-            async with aiofiles.open(file_path, "rb") as file:
-                file_content = await file.read()
-
-            response = await self.client.files.create(
-                file=(file_path.name, file_content), purpose="batch"
-            )
+            # The SDK only accepts sync file objects; passing the handle lets httpx
+            # stream it in chunks instead of buffering the whole file first.
+            async with self._semaphore("upload"):
+                with open(file_path, "rb") as file:
+                    response = await self.client.files.create(
+                        file=(file_path.name, file, "application/jsonl"),
+                        purpose="batch",
+                    )
             logger.info(
                 f"File uploaded successfully: {response.id}, Filename: {file_path.name}"
             )
@@ -34,39 +122,52 @@ class BatchProcessor:
 
     async def create_batch_job(self, input_file_id: str) -> Optional[BatchJob]:
         try:
-            batch_job = await self.client.batches.create(
-                input_file_id=input_file_id,
-                endpoint="/v1/chat/completions",
-                completion_window="24h",
-            )
+            async with self._semaphore("create"):
+                batch_job = await self.client.batches.create(
+                    input_file_id=input_file_id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h",
+                )
             logger.info(f"Created batch job with ID: {batch_job.id}")
-            return BatchJob(
-                id=batch_job.id,
-                status=self.normalize_status(batch_job.status),
-                input_file_id=input_file_id,
-            )
+            return BatchJob.from_openai(batch_job)
         except Exception as e:
             logger.error(f"Error creating batch job: {str(e)}")
             return None
 
-    async def check_batch_status(self, batch_id: str) -> Optional[str]:
+    async def check_batch_status(self, batch_id: str) -> Optional[BatchJob]:
         try:
-            batch_job = await self.client.batches.retrieve(batch_id)
-            return self.normalize_status(batch_job.status)
+            return await self._get_batch_fast(batch_id)
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Error checking batch status: {str(e)}")
             return None
 
+    async def _get_batch_fast(self, batch_id: str) -> BatchJob:
+        """Read the batch from the raw response, skipping SDK model parsing."""
+        response = await self.client.batches.with_raw_response.retrieve(batch_id)
+        return BatchJob.from_dict(orjson.loads(response.content))
+
     def normalize_status(self, status: str) -> str:
         """Normalize the status string to lowercase with underscores."""
-        return status.lower().replace(" ", "_")
+        return normalize_status(status)
+
+    def get_retry_after(self, error: Exception) -> Optional[float]:
+        """Return the Retry-After delay (in seconds) sent with an API error, if any."""
+        if not isinstance(error, APIStatusError):
+            return None
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
 
     async def download_batch_results(self, batch_job, output_file_path: Path) -> bool:
         try:
             if batch_job.status == "completed" and batch_job.output_file_id:
-                result = await self.client.files.content(batch_job.output_file_id)
-                async with aiofiles.open(output_file_path, "wb") as file:
-                    await file.write(result.content)
+                async with self._semaphore("download"):
+                    await self._stream_to_file(
+                        batch_job.output_file_id, output_file_path
+                    )
                 logger.info(f"Downloaded results to {output_file_path}")
                 return True
             else:
@@ -78,76 +179,234 @@ class BatchProcessor:
             logger.error(f"Error downloading batch results: {str(e)}")
             return False
 
+    async def wait_for_batch(self, batch_id: str) -> Optional[BatchJob]:
+        """Wait until the shared poller sees the batch reach a terminal status."""
+        future = self._pending.get(batch_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[batch_id] = future
+        # Poll promptly again so newly submitted jobs get fast first checks
+        self._poll_interval = self._check_interval
+        if self._poller_task is None or self._poller_task.done():
+            self._poller_task = asyncio.create_task(self._poll_pending())
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Stop polling for a job nobody is waiting on any more
+            if self._pending.get(batch_id) is future:
+                del self._pending[batch_id]
+            raise
+
+    def _resolve(self, batch_id: str, batch_job: Optional[BatchJob]) -> None:
+        future = self._pending.pop(batch_id, None)
+        if future is not None and not future.done():
+            future.set_result(batch_job)
+
+    async def _fetch_pending_batches(self) -> Dict[str, Optional[BatchJob]]:
+        batches: Dict[str, Optional[BatchJob]] = {}
+        after = None
+        for _ in range(MAX_LIST_PAGES):
+            params = {"limit": LIST_PAGE_SIZE}
+            if after is not None:
+                params["after"] = after
+            response = await self.client.batches.with_raw_response.list(**params)
+            page = orjson.loads(response.content)
+            for batch in page["data"]:
+                if batch["id"] in self._pending:
+                    batches[batch["id"]] = BatchJob.from_dict(batch)
+            # Stop once every pending job is found or the listing runs out
+            if len(batches) >= len(self._pending) or not page.get("has_more"):
+                break
+            if not page["data"]:
+                break
+            after = page["data"][-1]["id"]
+
+        # Anything not found in the listed pages is checked individually
+        missing = [batch_id for batch_id in self._pending if batch_id not in batches]
+        results = await asyncio.gather(
+            *(self.check_batch_status(batch_id) for batch_id in missing),
+            return_exceptions=True,
+        )
+        for batch_id, result in zip(missing, results):
+            if isinstance(result, BaseException):
+                raise result
+            batches[batch_id] = result
+        return batches
+
+    async def _poll_pending(self) -> None:
+        transient_failures = 0
+        try:
+            while self._pending:
+                retry_after = None
+                try:
+                    batches = await self._fetch_pending_batches()
+                except TRANSIENT_ERRORS as e:
+                    transient_failures += 1
+                    if transient_failures > self._max_transient_failures:
+                        raise
+                    retry_after = self.get_retry_after(e)
+                    logger.warning(
+                        f"Transient error checking batch jobs ({transient_failures}/{self._max_transient_failures}): {str(e)}"
+                    )
+                else:
+                    transient_failures = 0
+                    for batch_id, batch_job in batches.items():
+                        if batch_job is None or batch_job.status in TERMINAL_STATUSES:
+                            self._resolve(batch_id, batch_job)
+                    if not self._pending:
+                        break
+
+                # Jittered exponential backoff so polls don't land in lockstep
+                await asyncio.sleep(
+                    retry_after or self._poll_interval * random.uniform(0.8, 1.2)
+                )
+                self._poll_interval = min(
+                    self._poll_interval * self._growth, self._max_interval
+                )
+        except Exception as e:
+            logger.error(f"Error polling batch jobs: {str(e)}")
+            for batch_id in list(self._pending):
+                self._resolve(batch_id, None)
+
+    async def _stream_to_file(self, file_id: str, output_file_path: Path) -> None:
+        # Stream into a sibling file so an interrupted download never leaves
+        # a truncated results file behind
+        part_path = output_file_path.with_suffix(output_file_path.suffix + ".part")
+        try:
+            async with self.client.files.with_streaming_response.content(
+                file_id
+            ) as response:
+                async with aiofiles.open(part_path, "wb") as file:
+                    async for chunk in response.iter_bytes(
+                        chunk_size=DOWNLOAD_CHUNK_SIZE
+                    ):
+                        await file.write(chunk)
+            os.replace(part_path, output_file_path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
     async def process_batch_job(
         self, batch_job: BatchJob, output_dir: Path
     ) -> BatchJobResult:
-        check_interval = self.settings.check_interval
-        while True:
-            status = await self.check_batch_status(batch_job.id)
-            if status == "completed":
-                try:
-                    batch_job = await self.client.batches.retrieve(batch_job.id)
-                    if batch_job.output_file_id:
-                        output_file = output_dir / f"{batch_job.id}_results.jsonl"
-                        if await self.download_batch_results(batch_job, output_file):
-                            logger.info(
-                                f"Successfully processed batch job {batch_job.id}"
-                            )
-                            return BatchJobResult(
-                                job_id=batch_job.id,
-                                success=True,
-                                output_file_path=output_file,
-                            )
-                    else:
-                        logger.error(
-                            f"No output file ID found for completed batch job {batch_job.id}"
+        finished_job = await self.wait_for_batch(batch_job.id)
+        if finished_job is None:
+            logger.error(f"Failed to retrieve status for batch job {batch_job.id}")
+        elif finished_job.status == "completed":
+            # The poller already fetched output_file_id, so no extra retrieve is needed
+            batch_job = finished_job
+            try:
+                if batch_job.output_file_id:
+                    output_file = output_dir / f"{batch_job.id}_results.jsonl"
+                    if await self.download_batch_results(batch_job, output_file):
+                        logger.info(f"Successfully processed batch job {batch_job.id}")
+                        return BatchJobResult(
+                            job_id=batch_job.id,
+                            success=True,
+                            output_file_path=output_file,
                         )
-                except Exception as e:
+                else:
                     logger.error(
-                        f"Error processing completed batch job {batch_job.id}: {str(e)}"
+                        f"No output file ID found for completed batch job {batch_job.id}"
                     )
-            elif status in ["failed", "expired", "cancelled"]:
-                logger.error(f"Batch job {batch_job.id} {status}")
-                return BatchJobResult(job_id=batch_job.id, success=False)
-            elif status is None:
-                logger.error(f"Failed to retrieve status for batch job {batch_job.id}")
-                return BatchJobResult(job_id=batch_job.id, success=False)
-
-            await asyncio.sleep(check_interval)
-            check_interval = min(
-                check_interval * 1.5, 60
-            )  # Implement exponential backoff
+            except Exception as e:
+                logger.error(
+                    f"Error processing completed batch job {batch_job.id}: {str(e)}"
+                )
+        else:
+            logger.error(f"Batch job {batch_job.id} {finished_job.status}")
+        return BatchJobResult(job_id=batch_job.id, success=False)
+
+    async def discover_inputs(
+        self,
+        input_paths: List[Path],
+        on_skip: Optional[Callable[[Path], None]] = None,
+    ) -> List[Path]:
+        """Find the JSONL input files, walking directories off the event loop.
+
+        ``on_skip`` is called with each non-JSONL path that is skipped.
+        """
+        input_files, skipped = await asyncio.to_thread(_walk_inputs, input_paths)
+        for path in skipped:
+            logger.warning(f"Skipping non-JSONL file: {path}")
+            if on_skip is not None:
+                on_skip(path)
+        return input_files
 
     async def process_inputs(
         self, input_paths: List[Path], output_dir: Path
     ) -> List[BatchJobResult]:
-        input_files = []
-        for path in input_paths:
-            if path.is_dir():
-                input_files.extend(path.glob("*.jsonl"))
-            elif path.suffix.lower() == ".jsonl":
-                input_files.append(path)
-            else:
-                logger.warning(f"Skipping non-JSONL file: {path}")
-
+        input_files = await self.discover_inputs(input_paths)
         if not input_files:
             logger.warning("No input files found in the provided paths")
             return []
 
-        semaphore = asyncio.Semaphore(self.settings.max_concurrent_jobs)
+        return [result async for result in self.iter_results(input_files, output_dir)]
+
+    async def iter_results(
+        self,
+        input_files: List[Path],
+        output_dir: Path,
+        on_uploaded: Optional[Callable[[Path, Optional[str]], None]] = None,
+        on_created: Optional[Callable[[Path, Optional[BatchJob]], None]] = None,
+    ) -> AsyncIterator[BatchJobResult]:
+        """Yield each batch job result as soon as its job finishes.
+
+        ``on_uploaded`` is called with each input file and its file ID (None if
+        the upload failed), and ``on_created`` with the input file and its batch
+        job (None if creation failed). Files that fail either step yield nothing.
+        """
 
         async def process_file(input_file: Path) -> Optional[BatchJobResult]:
-            async with semaphore:
-                file_id = await self.upload_file(input_file)
-                if file_id:
-                    batch_job = await self.create_batch_job(file_id)
-                    if batch_job:
-                        return await self.process_batch_job(batch_job, output_dir)
+            # Concurrency is limited per API call inside each step, so waiting on
+            # a job's completion doesn't hold back other uploads or downloads.
+            file_id = await self.upload_file(input_file)
+            if on_uploaded is not None:
+                on_uploaded(input_file, file_id)
+            if file_id:
+                batch_job = await self.create_batch_job(file_id)
+                if on_created is not None:
+                    on_created(input_file, batch_job)
+                if batch_job:
+                    return await self.process_batch_job(batch_job, output_dir)
             return None
 
-        tasks = [process_file(file) for file in input_files]
-        results = await asyncio.gather(*tasks)
-        return [result for result in results if result is not None]
+        tasks = [asyncio.ensure_future(process_file(file)) for file in input_files]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is not None:
+                    yield result
+        finally:
+            # Don't leave jobs running if the consumer stops iterating early
+            for task in tasks:
+                task.cancel()
 
     async def close(self):
+        if self._poller_task is not None and not self._poller_task.done():
+            self._poller_task.cancel()
+            try:
+                await self._poller_task
+            except asyncio.CancelledError:
+                pass
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
         await self.client.close()
+
+    async def __aenter__(self) -> "BatchProcessor":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+_PROCESSOR: Optional[BatchProcessor] = None
+
+
+def get_processor() -> BatchProcessor:
+    """Return the shared BatchProcessor, creating it if needed or if it was closed."""
+    global _PROCESSOR
+    if _PROCESSOR is None or _PROCESSOR.client.is_closed():
+        _PROCESSOR = BatchProcessor()
+    return _PROCESSOR
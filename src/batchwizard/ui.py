@@ -1,8 +1,9 @@
 # ui.py
 import asyncio
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from loguru import logger
 from rich.console import Console
@@ -14,19 +15,30 @@ from rich.progress import (BarColumn, Progress, SpinnerColumn,
 from rich.table import Table
 from rich.text import Text
 
+from .models import BatchJob
 from .processor import BatchProcessor
 
+REFRESH_PER_SECOND = 4
+_STATUS_COLOR = {
+    "completed": "green",
+    "failed": "red",
+    "expired": "red",
+    "cancelled": "red",
+}
+
 
 class BatchWizardUI:
     def __init__(self, console: Console):
         self.console = console
         self.job_table = self.create_job_table()
         self.stats_table = self.create_stats_table()
-        self.log_messages = []
-        self.jobs = {}  # Dictionary to store job data
+        self.log_messages = deque(maxlen=10)  # Keep only the last 10 log messages
+        self._log_panel_text = ""
+        self.row_index = {}  # Job ID -> row index in job_table
         self.total_jobs = 0
         self.completed_jobs = 0
         self.failed_jobs = 0
+        self._ui_dirty = False  # Set when the layout needs re-rendering
 
     def create_layout(self) -> Layout:
         layout = Layout()
@@ -65,15 +77,17 @@ class BatchWizardUI:
         return job_table
 
     def update_job_status(self, job_id: str, status: str, progress: str):
-        color = (
-            "green"
-            if status == "completed"
-            else "red" if status in ["failed", "expired", "cancelled"] else "yellow"
-        )
-        self.jobs[job_id] = (f"[{color}]{status}", progress)
-        self.job_table = self.create_job_table()
-        for job_id, (status, progress) in self.jobs.items():
+        color = _STATUS_COLOR.get(status, "yellow")
+        status = f"[{color}]{status}"
+        row = self.row_index.get(job_id)
+        if row is None:
+            self.row_index[job_id] = len(self.job_table.rows)
             self.job_table.add_row(job_id, status, progress)
+        else:
+            # Update the existing row in place rather than rebuilding the table
+            self.job_table.columns[1]._cells[row] = status
+            self.job_table.columns[2]._cells[row] = progress
+        self._ui_dirty = True
 
     def create_stats_table(self):
         stats_table = Table(show_header=False, expand=True)
@@ -94,15 +108,18 @@ class BatchWizardUI:
             f"[yellow]{self.total_jobs - self.completed_jobs - self.failed_jobs}[/yellow]",
         )
         self.stats_table.add_row("Failed", f"[red]{self.failed_jobs}[/red]")
+        self._ui_dirty = True
 
     def add_log(self, message: str):
         self.log_messages.append(message)
-        if len(self.log_messages) > 10:  # Keep only the last 10 log messages
-            self.log_messages.pop(0)
+        self._log_panel_text = None
         logger.info(message)
+        self._ui_dirty = True
 
     def get_log_panel(self):
-        return Panel("\n".join(self.log_messages), title="Logs", border_style="green")
+        if self._log_panel_text is None:
+            self._log_panel_text = "\n".join(self.log_messages)
+        return Panel(self._log_panel_text, title="Logs", border_style="green")
 
     def update_layout(
         self,
@@ -127,6 +144,24 @@ class BatchWizardUI:
         )
         layout["body"]["sidebar"]["logs"].update(log_panel)
 
+    def render_layout(self, layout: Layout, overall_progress: Progress):
+        self._ui_dirty = False
+        self.update_layout(
+            layout,
+            "BatchWizard Processing",
+            overall_progress,
+            self.job_table,
+            self.stats_table,
+            self.get_log_panel(),
+        )
+
+    async def _ui_refresh_loop(self, layout: Layout, overall_progress: Progress):
+        """Re-render at most once per Live refresh, and only when state changed."""
+        while True:
+            if self._ui_dirty:
+                self.render_layout(layout, overall_progress)
+            await asyncio.sleep(1 / REFRESH_PER_SECOND)
+
     async def run_processing(
         self, processor: BatchProcessor, input_paths: List[Path], output_dir: Path
     ):
@@ -137,31 +172,22 @@ class BatchWizardUI:
         upload_task = overall_progress.add_task("[green]Uploading files", visible=False)
         process_task = overall_progress.add_task("[cyan]Processing jobs", visible=False)
 
-        async def update_ui():
-            self.update_layout(
-                layout,
-                "BatchWizard Processing",
-                overall_progress,
-                self.job_table,
-                self.stats_table,
-                self.get_log_panel(),
+        with Live(
+            layout,
+            console=self.console,
+            screen=True,
+            refresh_per_second=REFRESH_PER_SECOND,
+        ):
+            self.render_layout(layout, overall_progress)
+
+            input_files = await processor.discover_inputs(
+                input_paths,
+                on_skip=lambda path: self.add_log(f"Skipping non-JSONL file: {path}"),
             )
 
-        with Live(layout, console=self.console, screen=True, refresh_per_second=4):
-            await update_ui()
-
-            input_files = []
-            for path in input_paths:
-                if path.is_dir():
-                    input_files.extend(path.glob("*.jsonl"))
-                elif path.suffix.lower() == ".jsonl":
-                    input_files.append(path)
-                else:
-                    self.add_log(f"Skipping non-JSONL file: {path}")
-
             if not input_files:
                 self.add_log("No input files found in the provided paths")
-                await update_ui()
+                self.render_layout(layout, overall_progress)
                 return
 
             overall_progress.update(upload_task, total=len(input_files), visible=True)
@@ -169,48 +195,50 @@ class BatchWizardUI:
 
             self.total_jobs = len(input_files)
 
-            async def process_file(input_file: Path):
-                file_id = await processor.upload_file(input_file)
+            def on_uploaded(input_file: Path, file_id: Optional[str]):
                 overall_progress.update(upload_task, advance=1)
-                if file_id:
-                    batch_job = await processor.create_batch_job(file_id)
-                    if batch_job:
-                        self.update_job_status(batch_job.id, batch_job.status, "0%")
-                        self.add_log(f"Job created: {batch_job.id}")
-                        await update_ui()
-
-                        result = await processor.process_batch_job(
-                            batch_job, output_dir
-                        )
-                        if result.success:
-                            self.completed_jobs += 1
-                            self.update_job_status(batch_job.id, "completed", "100%")
-                            self.add_log(f"Job completed: {batch_job.id}")
-                            if result.output_file_path:
-                                self.add_log(
-                                    f"Results saved to: {result.output_file_path}"
-                                )
-                        else:
-                            self.failed_jobs += 1
-                            self.update_job_status(batch_job.id, "failed", "100%")
-                            self.add_log(f"Job failed: {batch_job.id}")
-
-                        overall_progress.update(process_task, advance=1)
-                        self.update_stats()
-                        await update_ui()
-                    else:
-                        self.add_log(
-                            f"Failed to create batch job for {input_file.name}"
-                        )
-                else:
+                if not file_id:
                     self.add_log(f"Failed to upload file {input_file.name}")
-                await update_ui()
 
-            tasks = [process_file(file) for file in input_files]
-            await asyncio.gather(*tasks)
+            def on_created(input_file: Path, batch_job: Optional[BatchJob]):
+                if batch_job:
+                    self.update_job_status(batch_job.id, batch_job.status, "0%")
+                    self.add_log(f"Job created: {batch_job.id}")
+                else:
+                    self.add_log(f"Failed to create batch job for {input_file.name}")
+
+            refresh_task = asyncio.create_task(
+                self._ui_refresh_loop(layout, overall_progress)
+            )
+            try:
+                async for result in processor.iter_results(
+                    input_files,
+                    output_dir,
+                    on_uploaded=on_uploaded,
+                    on_created=on_created,
+                ):
+                    if result.success:
+                        self.completed_jobs += 1
+                        self.update_job_status(result.job_id, "completed", "100%")
+                        self.add_log(f"Job completed: {result.job_id}")
+                        if result.output_file_path:
+                            self.add_log(f"Results saved to: {result.output_file_path}")
+                    else:
+                        self.failed_jobs += 1
+                        self.update_job_status(result.job_id, "failed", "100%")
+                        self.add_log(f"Job failed: {result.job_id}")
+
+                    overall_progress.update(process_task, advance=1)
+                    self.update_stats()
+            finally:
+                refresh_task.cancel()
+                try:
+                    await refresh_task
+                except asyncio.CancelledError:
+                    pass
 
             overall_progress.update(overall_task, completed=100)
-            await update_ui()
+            self.render_layout(layout, overall_progress)
 
         self.console.print("[bold green]Processing completed![/bold green]")
         self.console.print(f"Total jobs: {self.total_jobs}")
@@ -6,8 +6,14 @@ from rich.console import Console
 
 from .config import config
 
+_logger_configured = False
+
 
 def setup_logger(console: Console = None):
+    global _logger_configured
+    if _logger_configured:
+        return logger
+    _logger_configured = True
     logger.remove()
     if console is None:
         console = Console()
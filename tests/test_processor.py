@@ -0,0 +1,319 @@
+# test_processor.py
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from openai import AsyncOpenAI
+
+from batchwizard.models import BatchJob, BatchJobResult
+from batchwizard.processor import BatchProcessor
+
+
+class FakeBatchesAPI:
+    """Serves /v1/batches from an in-memory dict through an httpx MockTransport."""
+
+    def __init__(self):
+        self.batches = {}
+        # IDs left out of list pages, like jobs the listing never reaches
+        self.unlisted = set()
+        self.requests = []
+        # File contents as chunk lists; an exception entry aborts the stream
+        self.files = {}
+        self.retrieve_delay = 0
+        self.retrieves_in_flight = 0
+        self.max_retrieves_in_flight = 0
+        self.list_error = None
+        self.on_list = None
+
+    def add(self, batch_id, status="in_progress", listed=True):
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "status": status,
+            "input_file_id": f"file-in-{batch_id}",
+            "output_file_id": None,
+        }
+        if not listed:
+            self.unlisted.add(batch_id)
+
+    def finish(self, batch_id, status="completed"):
+        self.batches[batch_id]["status"] = status
+        if status == "completed":
+            self.batches[batch_id]["output_file_id"] = f"file-out-{batch_id}"
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if path == "/v1/batches":
+            if self.list_error is not None:
+                return httpx.Response(self.list_error, json={"error": {}})
+            listed = [
+                batch
+                for batch_id, batch in self.batches.items()
+                if batch_id not in self.unlisted
+            ]
+            start = 0
+            after = request.url.params.get("after")
+            if after is not None:
+                start = [batch["id"] for batch in listed].index(after) + 1
+            limit = int(request.url.params.get("limit", 20))
+            data = listed[start : start + limit]
+            response = httpx.Response(
+                200,
+                json={
+                    "object": "list",
+                    "data": data,
+                    "has_more": start + limit < len(listed),
+                },
+            )
+            if self.on_list is not None:
+                self.on_list()
+            return response
+        if path.endswith("/content"):
+            return httpx.Response(200, content=self._stream(path.split("/")[-2]))
+
+        self.retrieves_in_flight += 1
+        self.max_retrieves_in_flight = max(
+            self.max_retrieves_in_flight, self.retrieves_in_flight
+        )
+        try:
+            await asyncio.sleep(self.retrieve_delay)
+            return httpx.Response(200, json=self.batches[path.rsplit("/", 1)[-1]])
+        finally:
+            self.retrieves_in_flight -= 1
+
+    def list_calls(self):
+        return self.requests.count("/v1/batches")
+
+    async def _stream(self, file_id):
+        for chunk in self.files[file_id]:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+@pytest.fixture
+def api():
+    return FakeBatchesAPI()
+
+
+@pytest_asyncio.fixture
+async def processor(api, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    processor = BatchProcessor()
+    await processor.client.close()
+    processor.client = AsyncOpenAI(
+        api_key="sk-test",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handler)),
+    )
+    processor._check_interval = processor._poll_interval = 0.001
+    processor._max_interval = 0.01
+    yield processor
+    await processor.close()
+
+
+@pytest.mark.asyncio
+async def test_poller_resolves_pending_batches(api, processor):
+    api.add("batch-listed")
+    api.add("batch-old", listed=False)
+
+    def finish_all():
+        if api.list_calls() == 2:
+            api.finish("batch-listed")
+            api.finish("batch-old", "failed")
+
+    api.on_list = finish_all
+
+    listed, old = await asyncio.gather(
+        processor.wait_for_batch("batch-listed"),
+        processor.wait_for_batch("batch-old"),
+    )
+
+    assert listed.status == "completed"
+    assert listed.output_file_id == "file-out-batch-listed"
+    assert old.status == "failed"
+    # Only the job missing from the list page is retrieved individually
+    assert "/v1/batches/batch-old" in api.requests
+    assert "/v1/batches/batch-listed" not in api.requests
+    assert processor._pending == {}
+    assert processor._poller_task.done()
+
+
+@pytest.mark.asyncio
+async def test_poller_pages_through_more_than_100_pending_jobs(api, processor):
+    ids = [f"batch-{i}" for i in range(250)]
+    for batch_id in ids:
+        api.add(batch_id, status="completed")
+    for batch_id in ids[-5:]:
+        api.unlisted.add(batch_id)
+    api.retrieve_delay = 0.01
+
+    results = await asyncio.gather(*(processor.wait_for_batch(i) for i in ids))
+
+    assert [result.id for result in results] == ids
+    # Three pages cover the 245 listed jobs; the rest are retrieved concurrently
+    assert api.list_calls() == 3
+    assert len(api.requests) == 3 + 5
+    assert api.max_retrieves_in_flight == 5
+
+
+@pytest.mark.asyncio
+async def test_poller_restarts_after_draining(api, processor):
+    api.add("batch-1", status="completed")
+    first = await processor.wait_for_batch("batch-1")
+    first_task = processor._poller_task
+    assert first.status == "completed"
+    assert first_task.done()
+
+    api.add("batch-2", status="expired")
+    second = await processor.wait_for_batch("batch-2")
+    assert second.status == "expired"
+    assert processor._poller_task is not first_task
+
+
+@pytest.mark.asyncio
+async def test_pending_resolved_on_non_transient_error(api, processor):
+    api.add("batch-1")
+    api.add("batch-2")
+    api.list_error = 400
+
+    results = await asyncio.gather(
+        processor.wait_for_batch("batch-1"),
+        processor.wait_for_batch("batch-2"),
+    )
+
+    assert results == [None, None]
+    assert api.list_calls() == 1
+    assert processor._pending == {}
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_back_off_then_give_up(api, processor):
+    api.add("batch-1")
+    api.list_error = 503
+    processor._max_transient_failures = 3
+
+    assert await processor.wait_for_batch("batch-1") is None
+    assert api.list_calls() == 4
+    assert processor._poll_interval > 0.001
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_stops_polling_for_the_batch(api, processor):
+    api.add("batch-abandoned")
+
+    waiter = asyncio.ensure_future(processor.wait_for_batch("batch-abandoned"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert processor._pending == {}
+
+
+@pytest.mark.asyncio
+async def test_iter_results_reports_each_step(processor, monkeypatch, tmp_path):
+    good, bad = tmp_path / "good.jsonl", tmp_path / "bad.jsonl"
+
+    async def upload_file(file_path):
+        return None if file_path == bad else f"file-{file_path.stem}"
+
+    async def create_batch_job(file_id):
+        return BatchJob(
+            id=f"batch-{file_id}", status="validating", input_file_id=file_id
+        )
+
+    async def process_batch_job(batch_job, output_dir):
+        return BatchJobResult(job_id=batch_job.id, success=True)
+
+    monkeypatch.setattr(processor, "upload_file", upload_file)
+    monkeypatch.setattr(processor, "create_batch_job", create_batch_job)
+    monkeypatch.setattr(processor, "process_batch_job", process_batch_job)
+    uploaded, created = [], []
+
+    results = [
+        result
+        async for result in processor.iter_results(
+            [good, bad],
+            tmp_path,
+            on_uploaded=lambda path, file_id: uploaded.append((path.name, file_id)),
+            on_created=lambda path, job: created.append((path.name, job.id)),
+        )
+    ]
+
+    assert results == [BatchJobResult(job_id="batch-file-good", success=True)]
+    assert sorted(uploaded) == [("bad.jsonl", None), ("good.jsonl", "file-good")]
+    assert created == [("good.jsonl", "batch-file-good")]
+
+
+@pytest.mark.asyncio
+async def test_download_replaces_results_only_when_complete(api, processor, tmp_path):
+    output_file_path = tmp_path / "results.jsonl"
+    api.files["file-ok"] = [b'{"a": 1}\n', b'{"b": 2}\n']
+    api.files["file-broken"] = [b'{"c": 3}\n', httpx.ReadError("connection lost")]
+
+    await processor._stream_to_file("file-ok", output_file_path)
+    assert output_file_path.read_bytes() == b'{"a": 1}\n{"b": 2}\n'
+
+    with pytest.raises(httpx.ReadError):
+        await processor._stream_to_file("file-broken", output_file_path)
+    # The earlier results survive and no partial file is left behind
+    assert output_file_path.read_bytes() == b'{"a": 1}\n{"b": 2}\n'
+    assert [path.name for path in tmp_path.iterdir()] == ["results.jsonl"]
+
+
+@pytest.mark.asyncio
+async def test_discover_inputs_reports_skipped_paths(processor, tmp_path):
+    input_dir = tmp_path / "inputs"
+    input_dir.mkdir()
+    (input_dir / "a.jsonl").write_text("{}\n")
+    (input_dir / "DATA.JSONL").write_text("{}\n")
+    (input_dir / "notes.txt").write_text("")
+    (input_dir / "x.jsonl").mkdir()
+    single = tmp_path / "single.JSONL"
+    single.write_text("{}\n")
+    skipped_file = tmp_path / "skip.txt"
+    skipped_file.write_text("")
+    skipped = []
+
+    input_files = await processor.discover_inputs(
+        [input_dir, single, skipped_file], on_skip=skipped.append
+    )
+
+    assert sorted(path.name for path in input_files) == [
+        "DATA.JSONL",
+        "a.jsonl",
+        "single.JSONL",
+    ]
+    assert skipped == [skipped_file]
+
+
+def test_uploads_contend_in_a_loop_created_after_init(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    processor = BatchProcessor()
+    processor._concurrency_limits["upload"] = 1
+    active = []
+
+    async def create(**kwargs):
+        active.append(kwargs["file"][0])
+        assert len(active) == 1
+        await asyncio.sleep(0.01)
+        active.pop()
+        return type("FileObject", (), {"id": f"file-{kwargs['file'][0]}"})()
+
+    processor.client.files.create = create
+    paths = []
+    for name in ("a.jsonl", "b.jsonl"):
+        path = tmp_path / name
+        path.write_text("{}\n")
+        paths.append(path)
+
+    async def upload_all():
+        try:
+            return await asyncio.gather(*(processor.upload_file(p) for p in paths))
+        finally:
+            await processor.close()
+
+    assert asyncio.run(upload_all()) == ["file-a.jsonl", "file-b.jsonl"]